@@ -0,0 +1,17 @@
+# Public file profile types for each FCC service code
+service_code_map = {
+    'AM': 'am-profile',
+    'FM': 'fm-profile',
+    # Add additional mappings if needed
+}
+
+def get_service_profile_url(service_code, call_sign):
+    """Generate the FCC URL for the station's profile page, with a maximum 7-character call sign."""
+    profile_type = service_code_map.get(service_code, '').lower()
+
+    # Ensure the call sign is in lowercase and limited to 7 characters
+    truncated_call_sign = call_sign.upper()[:7]
+
+    if profile_type:
+        return f"https://publicfiles.fcc.gov/{profile_type}/{truncated_call_sign}/rss"
+    return ""
@@ -14,14 +14,13 @@ def fetch_html(url):
         raise Exception(f"Failed to fetch data. Status code: {response.status_code}")
 
 def parse_stations_from_html(html_content):
-    soup = BeautifulSoup(html_content, 'html.parser')
+    # Build the full tree so the sibling walk below only sees each state's own section
+    soup = BeautifulSoup(html_content, 'lxml')
     data = []
 
     # Find all sections that potentially contain state information
     # Looking for h2 tags that contain 'mw-headline' to avoid processing irrelevant h2 tags
-    state_sections = [h2 for h2 in soup.find_all('h2') if h2.find('span', class_='mw-headline')]
-
-    for state_section in state_sections:
+    for state_section in soup.find_all('h2'):
         state_headline = state_section.find('span', class_='mw-headline')
         if not state_headline:
             continue
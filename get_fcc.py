@@ -1,12 +1,26 @@
 import csv
 import requests
+import concurrent.futures
+from requests.adapters import HTTPAdapter
+from requests_cache import CachedSession
+from fcc_urls import get_service_profile_url
 
 # CSV file containing the stations' information
 input_csv_file = 'urban_radio_stations.csv'
 output_csv_file = 'urban_radio_stations_checked.csv'
+# Columns written by fetch_radio_stations.py, read positionally below
+input_fieldnames = ['State', 'City', 'Station', 'Format']
 
 # FCC API endpoint
 api_url = "https://publicfiles.fcc.gov/api/service/facility/search/"
+# Number of API requests made in parallel
+max_workers = 16
+
+# Shared session so API requests reuse pooled keep-alive connections; successful
+# responses are cached on disk for a day so reruns skip the network
+session = CachedSession('.fcc_http_cache', backend='sqlite', expire_after=86400, allowable_codes=(200,))
+session.headers.update({'User-Agent': 'fcc-publicfile-tracker'})
+session.mount('https://', HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers, max_retries=3))
 
 # Dictionary to map full state names to their two-letter abbreviations
 states_to_abbreviations = {
@@ -29,47 +43,40 @@ def search_station_on_fcc(station_name):
         station_name = station_name.split('/')[0]
     elif "-" in station_name:
         station_name = station_name.split('-')[0]
-    response = requests.get(api_url + station_name)
-    if response.status_code == 200:
-        return response.json()
-    else:
-        print(f"Error {response.status_code} for station {station_name}")
+    try:
+        response = session.get(api_url + station_name, timeout=10)
+        if response.status_code == 200:
+            return response.json()
+    except (requests.RequestException, ValueError) as e:
+        # ValueError covers a 200 response whose body is not JSON
+        print(f"Error searching for station {station_name}: {e}")
         return None
-
-def get_service_profile_url(service_code, call_sign):
-    """Generate the FCC URL for the station's profile page, with a maximum 7-character call sign."""
-    service_code_map = {
-        'AM': 'am-profile',
-        'FM': 'fm-profile',
-        # Add additional mappings if needed
-    }
-    profile_type = service_code_map.get(service_code, '').lower()
-
-    # Ensure the call sign is in lowercase and limited to 7 characters
-    truncated_call_sign = call_sign.upper()[:7]
-
-    if profile_type:
-        return f"https://publicfiles.fcc.gov/{profile_type}/{truncated_call_sign}/rss"
-    return ""
-
+    print(f"Error {response.status_code} for station {station_name}")
+    return None
 
 def process_csv_and_generate_output(input_csv_file, output_csv_file):
     """Read the input CSV, query FCC API, and write results with matching info to output CSV."""
-    with open(input_csv_file, newline='', encoding='utf-8') as input_file, open(output_csv_file, mode='w', newline='', encoding='utf-8') as output_file:
-        reader = csv.DictReader(input_file)
-        fieldnames = reader.fieldnames + ['City Match', 'State Match', 'FCC URL']
-        writer = csv.DictWriter(output_file, fieldnames=fieldnames)
+    with open(input_csv_file, newline='', encoding='utf-8') as input_file, open(output_csv_file, mode='w', newline='', encoding='utf-8', buffering=1 << 20) as output_file:
+        reader = csv.reader(input_file)
+        header = next(reader)
+        if header != input_fieldnames:
+            raise ValueError(f"Unexpected columns in {input_csv_file}: {header}; expected {input_fieldnames}")
+        writer = csv.writer(output_file)
 
         # Write the header for the new CSV
-        writer.writeheader()
+        writer.writerow(header + ['City Match', 'State Match', 'FCC URL'])
+
+        rows = list(reader)
 
-        for row in reader:
-            station_name = row['Station'].strip()
-            expected_city = row['City'].strip().upper()
-            expected_state = row['State'].strip()
-            expected_state_abbr = states_to_abbreviations.get(expected_state, '')
+        # Query the FCC API for all stations in parallel; map keeps results in row order
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(search_station_on_fcc, [station.strip() for _, _, station, _ in rows])
 
-            fcc_data = search_station_on_fcc(station_name)
+        output_rows = []
+        for row, fcc_data in zip(rows, results):
+            state, city, _, _ = row
+            expected_city = city.strip().upper()
+            expected_state_abbr = states_to_abbreviations.get(state.strip(), '')
 
             city_match = 'No'
             state_match = 'No'
@@ -83,29 +90,20 @@ def process_csv_and_generate_output(input_csv_file, output_csv_file):
                 # Combine all facility lists
                 all_facilities = am_facilities + fm_facilities + tv_facilities
 
-                for facility in all_facilities:
-                    facility_city = facility['communityCity'].upper()
-                    facility_state_abbr = facility['communityState']
-                    city_matches = facility_city == expected_city
-                    state_matches = facility_state_abbr == expected_state_abbr
-
-                    if city_matches:
+                # Assume the first facility is the most relevant match
+                if all_facilities:
+                    facility = all_facilities[0]
+                    if facility['communityCity'].upper() == expected_city:
                         city_match = 'Yes'
-                    if state_matches:
+                    if facility['communityState'] == expected_state_abbr:
                         state_match = 'Yes'
+                    fcc_url = get_service_profile_url(facility['serviceCode'], facility['callSign'])
 
-                    service_code = facility['serviceCode']
-                    call_sign = facility['callSign']
-                    fcc_url = get_service_profile_url(service_code, call_sign)
-
-                    # Assume the first facility is the most relevant match
-                    break
+            # Add the match information to the current row
+            output_rows.append((*row, city_match, state_match, fcc_url))
 
-            # Update the current row with the match information and write it to the output CSV
-            row['City Match'] = city_match
-            row['State Match'] = state_match
-            row['FCC URL'] = fcc_url
-            writer.writerow(row)
+        # Write all rows to the output CSV in one call
+        writer.writerows(output_rows)
 
 # Main Execution
 if __name__ == "__main__":
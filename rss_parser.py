@@ -1,17 +1,68 @@
+import argparse
 import csv
 import feedparser
 import json
+import os
+import pickle
+import re
+import textwrap
+import requests
 import concurrent.futures
+from requests.adapters import HTTPAdapter
+from fcc_urls import get_service_profile_url
 
 # Input CSV file containing station URLs, states, and cities
 csv_file = 'urban_radio_stations_with_status.csv'
 # JSON file to save collected data
 json_file = 'radio_ads.json'
+# Sidecar cache of the entry ids already saved in the JSON file
+ids_file = 'radio_ads.ids.pkl'
+# ETag/Last-Modified validators per feed URL, sent back as conditional GETs
+feed_cache_file = 'feed_cache.json'
+feed_cache = {}
+# Number of feeds fetched in parallel
+max_workers = 32
+
+# Shared session so feed requests reuse pooled TCP/TLS connections
+session = requests.Session()
+session.mount('https://', HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers))
+
+# Pull the facility ID (uploader) and the folder path out of an entry title, e.g.
+# "am Entity 63775 uploaded a file in Political Files/2024/Federal/US Senate/Lucy McBath";
+# they are matched separately so a title missing one still yields the other
+FACILITY_ID_RE = re.compile(r'Entity (\d+)(?: |$)')
+PATH_RE = re.compile(r' in (.*?)(?: on |$)', re.DOTALL)
 
 def parse_feed(station_url, state, city):
     """Parse the RSS feed from the given station URL and include state and city."""
-    # Parse the feed using feedparser
-    feed = feedparser.parse(station_url)
+    # Fetch the feed over the shared session, asking the server to skip the body
+    # if the feed has not changed since the validators saved on the last run
+    cached = feed_cache.get(station_url, {})
+    headers = {}
+    if cached.get('etag'):
+        headers['If-None-Match'] = cached['etag']
+    if cached.get('modified'):
+        headers['If-Modified-Since'] = cached['modified']
+    try:
+        response = session.get(station_url, headers=headers, timeout=30)
+        response.raise_for_status()
+    except requests.RequestException as e:
+        print(f"Error fetching feed {station_url}: {e}")
+        return []
+    if response.status_code == 304:
+        return []
+
+    validators = {'etag': response.headers.get('ETag'), 'modified': response.headers.get('Last-Modified')}
+    if any(validators.values()):
+        feed_cache[station_url] = validators
+    else:
+        feed_cache.pop(station_url, None)
+
+    # Parse the feed using feedparser, passing the response headers so it can
+    # still use the charset and Content-Location as when it fetched feeds itself;
+    # feedparser looks them up by lowercase name, so the keys are lowercased
+    response_headers = {key.lower(): value for key, value in response.headers.items()}
+    feed = feedparser.parse(response.content, response_headers=response_headers)
     
     # List to store extracted entries information
     entries_list = []
@@ -29,21 +80,16 @@ def parse_feed(station_url, state, city):
         updated = entry.updated
 
         # Extract the sponsor from the title
-        sponsor = title.split('/')[-1]
+        sponsor = title.rsplit('/', 1)[-1]
 
         # Extract facility ID (uploader) from the title
-        try:
-            facility_id = int(title.split('Entity ')[1].split(' ')[0])
-        except (IndexError, ValueError):
-            facility_id = None
-
-        # Extract relevant information from the content
-        try:
-            file_info = title.split(' in ')[1].split(' on ')
-            file_segments = file_info[0].split('/')
-            office = file_segments[-2]
-        except (IndexError, ValueError):
-            office = None
+        match = FACILITY_ID_RE.search(title)
+        facility_id = int(match[1]) if match else None
+
+        # Extract the office, the folder directly above the file
+        match = PATH_RE.search(title)
+        file_segments = match[1].rsplit('/', 2) if match else []
+        office = file_segments[-2] if len(file_segments) > 1 else None
 
         # Create a dictionary to store the entry information
         entry_dict = {
@@ -64,43 +110,135 @@ def parse_feed(station_url, state, city):
 
     return entries_list
 
-def fetch_rss_entries(csv_file):
-    """Fetch RSS entries for each station URL in the provided CSV file."""
+def load_existing_ids():
+    """Return the set of entry ids already saved in the JSON file."""
+    # The sidecar stores the size and modification time of the JSON file it was
+    # written against, so a JSON file changed by anything else causes a rebuild
+    # from the JSON itself
+    try:
+        with open(ids_file, 'rb') as file:
+            json_stamp, existing_ids = pickle.load(file)
+        if json_stamp == json_file_stamp():
+            return existing_ids
+    except (FileNotFoundError, EOFError, TypeError, ValueError, pickle.UnpicklingError):
+        pass
+
     # Load the existing data from radio_ads.json if it exists
+    try:
+        with open(json_file, 'r') as file:
+            return {entry['id'] for entry in json.load(file)}
+    except FileNotFoundError:
+        return set()
+
+def json_file_stamp():
+    """Return the (size, mtime) pair that identifies the current JSON file."""
+    stat = os.stat(json_file)
+    return stat.st_size, stat.st_mtime_ns
+
+def save_existing_ids(existing_ids):
+    """Atomically replace the id sidecar for the current JSON file."""
+    temp_file = ids_file + '.tmp'
+    with open(temp_file, 'wb') as file:
+        pickle.dump((json_file_stamp(), existing_ids), file, protocol=5)
+    os.replace(temp_file, ids_file)
+
+def append_entries(new_entries):
+    """Append entries to the JSON array in place, keeping the json.dump(indent=4) layout."""
+    entries_json = ',\n'.join(textwrap.indent(json.dumps(entry, indent=4), '    ') for entry in new_entries)
+
+    # A non-empty array written with indent=4 ends in "\n]", so the new entries
+    # can be written over that closing bracket
+    try:
+        with open(json_file, 'r+b') as file:
+            if file.seek(0, os.SEEK_END) > 2:
+                file.seek(-2, os.SEEK_END)
+                if file.read(2) == b'\n]':
+                    file.seek(-2, os.SEEK_END)
+                    file.write(f',\n{entries_json}\n]'.encode())
+                    return
+    except FileNotFoundError:
+        pass
+
+    # Otherwise the archive is missing, empty or formatted differently, so rewrite it whole
     try:
         with open(json_file, 'r') as file:
             existing_data = json.load(file)
     except FileNotFoundError:
         existing_data = []
+    existing_data.extend(new_entries)
+    with open(json_file, 'w') as file:
+        json.dump(existing_data, file, indent=4)
 
-    existing_ids = {entry['id'] for entry in existing_data}
+def load_feed_cache():
+    """Load the saved feed validators into feed_cache."""
+    try:
+        with open(feed_cache_file, 'r') as file:
+            feed_cache.update(json.load(file))
+    except FileNotFoundError:
+        pass
+
+def save_feed_cache():
+    """Write feed_cache to disk for the next run."""
+    with open(feed_cache_file, 'w') as file:
+        json.dump(feed_cache, file, indent=4, sort_keys=True)
+
+def station_feed_url(station):
+    """Build the RSS feed URL for a call sign with its band, e.g. WAOK-AM."""
+    call_sign, _, service_code = station.strip().upper().rpartition('-')
+    return get_service_profile_url(service_code, call_sign)
 
-    # Read the CSV file to get the URLs, state, and city information
+def read_stations_csv(csv_file):
+    """Return (station URL, state, city) tuples for each station in the provided CSV file."""
     with open(csv_file, newline='', encoding='utf-8') as file:
         reader = csv.DictReader(file)
-        entries_list = []
-
-        # Use ThreadPoolExecutor to parse feeds in parallel
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            futures = []
-            for row in reader:
-                station_url = row.get('FCC URL')
-                state = row.get('State')
-                city = row.get('City')
-                if station_url:
-                    futures.append(executor.submit(parse_feed, station_url, state, city))
-
-            for future in concurrent.futures.as_completed(futures):
-                entries_list.extend(future.result())
-
-        # Add only new entries to the existing data
-        new_entries = [entry for entry in entries_list if entry['id'] not in existing_ids]
-        existing_data.extend(new_entries)
-
-    # Write the combined data to radio_ads.json
-    with open(json_file, 'w') as file:
-        json.dump(existing_data, file, indent=4)
+        return [(row.get('FCC URL'), row.get('State'), row.get('City')) for row in reader if row.get('FCC URL')]
+
+def fetch_rss_entries(stations):
+    """Fetch RSS entries for each (station URL, state, city) tuple."""
+    existing_ids = load_existing_ids()
+    load_feed_cache()
+    entries_list = []
+
+    # Use ThreadPoolExecutor to parse feeds in parallel
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(parse_feed, station_url, state, city) for station_url, state, city in stations]
+
+        for future in concurrent.futures.as_completed(futures):
+            entries_list.extend(future.result())
+
+    # Keep only new entries, recording each id as it is kept so an entry
+    # seen in more than one feed is only stored once
+    new_entries = []
+    for entry in entries_list:
+        if entry['id'] not in existing_ids:
+            new_entries.append(entry)
+            existing_ids.add(entry['id'])
+
+    # Append the new entries to radio_ads.json without reloading the archive
+    if new_entries:
+        append_entries(new_entries)
+    if os.path.exists(json_file):
+        save_existing_ids(existing_ids)
+
+    # Only save the validators once the entries they cover are stored
+    save_feed_cache()
 
 # Main execution
 if __name__ == "__main__":
-    fetch_rss_entries(csv_file)
+    parser = argparse.ArgumentParser(description="Collect new public file entries from station RSS feeds.")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--csv', default=csv_file, help=f"CSV file with 'FCC URL', 'State' and 'City' columns (default: {csv_file})")
+    source.add_argument('--stations', help="comma-separated call signs with band, e.g. WAOK-AM,WVEE-FM")
+    args = parser.parse_args()
+
+    if args.stations:
+        stations = []
+        for station in args.stations.split(','):
+            station_url = station_feed_url(station)
+            if not station_url:
+                parser.error(f"Cannot build a feed URL for {station!r}; expected a call sign and band like WAOK-AM")
+            stations.append((station_url, None, None))
+    else:
+        stations = read_stations_csv(args.csv)
+
+    fetch_rss_entries(stations)
@@ -0,0 +1,49 @@
+import requests
+
+import rss_parser
+
+FEED_URL = 'https://publicfiles.fcc.gov/fm-profile/WVEE/rss'
+
+# A UTF-8 feed with no encoding= in its XML declaration, so the charset
+# can only come from the Content-Type header
+UTF8_FEED = '''<?xml version="1.0"?>
+<rss version="2.0">
+<channel>
+<title>WVEE public file</title>
+<item>
+<title>fm Entity 63775 uploaded a file in Political Files/2024/Federal/US Senate/Peña for Senate</title>
+<link>https://publicfiles.fcc.gov/fm-profile/WVEE/political-files/2024/peña</link>
+<guid>https://publicfiles.fcc.gov/fm-profile/WVEE/political-files/2024/peña</guid>
+<pubDate>Tue, 01 Oct 2024 12:00:00 GMT</pubDate>
+</item>
+</channel>
+</rss>
+'''.encode('utf-8')
+
+def make_response(content, headers):
+    response = requests.Response()
+    response.status_code = 200
+    response._content = content
+    response.headers.update(headers)
+    response.url = FEED_URL
+    return response
+
+def test_parse_feed_uses_response_charset(monkeypatch):
+    response = make_response(UTF8_FEED, {'Content-Type': 'application/rss+xml; charset=utf-8'})
+    monkeypatch.setattr(rss_parser.session, 'get', lambda *args, **kwargs: response)
+    monkeypatch.setattr(rss_parser, 'feed_cache', {})
+
+    parsed = []
+    original_parse = rss_parser.feedparser.parse
+    def parse(*args, **kwargs):
+        parsed.append(original_parse(*args, **kwargs))
+        return parsed[-1]
+    monkeypatch.setattr(rss_parser.feedparser, 'parse', parse)
+
+    entries = rss_parser.parse_feed(FEED_URL, 'Georgia', 'Atlanta')
+
+    assert parsed[0].bozo == False
+    assert parsed[0].encoding == 'utf-8'
+    assert entries[0]['facility_id'] == 63775
+    assert entries[0]['office'] == 'US Senate'
+    assert entries[0]['sponsor'] == 'Peña for Senate'
@@ -1,15 +1,27 @@
 import csv
 import requests
+import concurrent.futures
+from requests.adapters import HTTPAdapter
 
 # Input CSV file
 input_csv = 'urban_radio_stations_checked.csv'
 # Output CSV file with status code
 output_csv = 'urban_radio_stations_with_status.csv'
+# Number of URLs checked in parallel
+max_workers = 32
+
+# Shared session so checks reuse pooled keep-alive connections
+session = requests.Session()
+session.mount('https://', HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers))
 
 def check_url_status(url):
     """Check the HTTP status code of a given URL."""
     try:
-        response = requests.get(url)
+        # Only the status code is needed, so skip the body with a HEAD request,
+        # falling back to GET for servers that do not allow HEAD
+        response = session.head(url, allow_redirects=True, timeout=10)
+        if response.status_code == 405:
+            response = session.get(url, timeout=10)
         return response.status_code
     except requests.RequestException as e:
         print(f"Error checking URL {url}: {e}")
@@ -20,20 +32,20 @@ def add_status_code_to_csv(input_csv, output_csv):
     with open(input_csv, newline='', encoding='utf-8') as infile:
         reader = csv.DictReader(infile)
         fieldnames = reader.fieldnames + ['HTTP Status Code']
-        
-        with open(output_csv, mode='w', newline='', encoding='utf-8') as outfile:
-            writer = csv.DictWriter(outfile, fieldnames=fieldnames)
-            writer.writeheader()
-            
-            for row in reader:
-                url = row.get('FCC URL')
-                if url:
-                    status_code = check_url_status(url)
-                    row['HTTP Status Code'] = status_code
-                else:
-                    row['HTTP Status Code'] = 'N/A'
-                
-                writer.writerow(row)
+        rows = list(reader)
+
+    # Check all URLs in parallel; map keeps the status codes in row order
+    urls = [row.get('FCC URL') for row in rows]
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        status_codes = executor.map(check_url_status, [url for url in urls if url])
+
+    with open(output_csv, mode='w', newline='', encoding='utf-8') as outfile:
+        writer = csv.DictWriter(outfile, fieldnames=fieldnames)
+        writer.writeheader()
+
+        for row, url in zip(rows, urls):
+            row['HTTP Status Code'] = next(status_codes) if url else 'N/A'
+            writer.writerow(row)
 
 # Main execution
 if __name__ == "__main__":